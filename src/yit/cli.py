@@ -1,26 +1,98 @@
-import argparse
 import sys
+from types import SimpleNamespace
 from .utils import check_for_updates, show_update_notice, __version__
-from .installer import get_mpv_path
-from .commands import (
-    cmd_search, cmd_play, cmd_pause, cmd_resume, cmd_toggle,
-    cmd_stop, cmd_loop, cmd_unloop, cmd_add, cmd_next, cmd_prev,
-    cmd_restart, cmd_clear, cmd_queue, cmd_status, cmd_agent,
-    cmd_commands, cmd_fav
-)
+
+# Argument-less commands (name of their handler in .commands)
+_FAST_COMMANDS = {
+    "pause": "cmd_pause", "p": "cmd_pause",
+    "resume": "cmd_resume", "r": "cmd_resume",
+    "next": "cmd_next", "n": "cmd_next",
+    "back": "cmd_prev", "b": "cmd_prev",
+    "replay": "cmd_restart", "0": "cmd_restart",
+    "toggle": "cmd_toggle",
+    "stop": "cmd_stop",
+    "loop": "cmd_loop",
+    "unloop": "cmd_unloop",
+    "queue": "cmd_queue",
+    "clear": "cmd_clear",
+    "status": "cmd_status",
+    "agent": "cmd_agent",
+    "commands": "cmd_commands",
+}
+
+# Commands that may need to launch MPV
+_PLAYER_COMMANDS = {"play", "add", "search"}
+
+_FAV_ACTIONS = {"add", "list", "play", "remove"}
+_PLAY_FLAGS = {"-p", "--play"}
+
+def _fast_parse(argv):
+    """Parses well-formed invocations without argparse.
+
+    Returns (handler name, args), or None to let argparse handle help,
+    version and errors.
+    """
+    if not argv:
+        return None
+    name, rest = argv[0], argv[1:]
+
+    if name in _FAST_COMMANDS:
+        return (_FAST_COMMANDS[name], SimpleNamespace()) if not rest else None
+
+    if name in ("play", "add"):
+        if len(rest) == 1 and rest[0].isdecimal():
+            return f"cmd_{name}", SimpleNamespace(number=int(rest[0]))
+
+    elif name == "search":
+        query = [a for a in rest if a not in _PLAY_FLAGS]
+        if query and not any(a.startswith("-") for a in query):
+            return "cmd_search", SimpleNamespace(query=query, play=len(query) < len(rest))
+
+    elif name == "fav":
+        if len(rest) <= 2 and not any(a.startswith("-") for a in rest):
+            action = rest[0] if rest else "list"
+            if action in _FAV_ACTIONS:
+                return "cmd_fav", SimpleNamespace(action=action, target=rest[1] if len(rest) > 1 else None)
+
+    return None
 
 def main():
     show_update_notice()
-    check_for_updates()
 
-    try:
-        if len(sys.argv) > 1 and sys.argv[1] in ("-v", "--version"):
-            # Don't block version check on mpv install
-            pass
-        else:
-            get_mpv_path()
-    except SystemExit:
-        return # already printed error
+    argv = sys.argv[1:]
+    parsed = _fast_parse(argv)
+    if parsed is None:
+        args = _parse_args(argv)
+    else:
+        from . import commands
+        handler, args = parsed
+        args.func = getattr(commands, handler)
+
+    # Control commands skip the update check and MPV lookup
+    if argv[0] not in _FAST_COMMANDS:
+        check_for_updates()
+
+        try:
+            # Only commands that may start the player need MPV installed
+            if argv[0] in _PLAYER_COMMANDS:
+                from .installer import get_mpv_path
+                get_mpv_path()
+        except SystemExit:
+            return # already printed error
+
+    output = args.func(args)
+    if output:
+        print(output)
+
+def _parse_args(argv):
+    """Full argparse parser, used for --help, --version and malformed input."""
+    import argparse
+    from .commands import (
+        cmd_search, cmd_play, cmd_pause, cmd_resume, cmd_toggle,
+        cmd_stop, cmd_loop, cmd_unloop, cmd_add, cmd_next, cmd_prev,
+        cmd_restart, cmd_clear, cmd_queue, cmd_status, cmd_agent,
+        cmd_commands, cmd_fav
+    )
 
     parser = argparse.ArgumentParser(prog="yit", description="Yit (YouTube in Terminal) - Fire-and-Forget Music Player")
     parser.add_argument("-v", "--version", action="version", version=f"%(prog)s {__version__}")
@@ -89,7 +161,7 @@ def main():
     # Favorites
     parser_fav = subparsers.add_parser("fav", help="Manage favorites")
     # Sub-arguments for fav: action (add, list, play, remove) and target (index)
-    parser_fav.add_argument("action", nargs="?", default="list", choices=["add", "list", "play", "remove"], help="Action to perform")
+    parser_fav.add_argument("action", nargs="?", default="list", choices=sorted(_FAV_ACTIONS), help="Action to perform")
     parser_fav.add_argument("target", nargs="?", help="Index (for add/play/remove)")
     parser_fav.set_defaults(func=cmd_fav)
 
@@ -97,5 +169,4 @@ def main():
     subparsers.add_parser("loop", help="Loop current track").set_defaults(func=cmd_loop)
     subparsers.add_parser("unloop", help="Stop looping").set_defaults(func=cmd_unloop)
 
-    args = parser.parse_args()
-    args.func(args)
+    return parser.parse_args(argv)
@@ -1,258 +1,375 @@
 import os
 import sys
-import json
-import subprocess
+import functools
+import itertools
+import threading
+import time
 from pathlib import Path
-from types import SimpleNamespace
 
 from .config import RESULTS_FILE, HISTORY_FILE, IPC_PIPE, ensure_yit_dir
 from .utils import extract_video_id
-from .ipc import send_ipc_command, get_ipc_property
-from .storage import save_to_history, load_favorites, save_favorites
-from .installer import get_mpv_path
+from .jsonio import dumps, loads
+from .ipc import batch_get, send_ipc_command, send_ipc_batch, get_ipc_property
+from .storage import (
+    save_tracks_to_history, iter_history, load_favorites, add_favorite, save_favorites,
+    get_cached_search, cache_search, save_results, load_json
+)
+
+PLAYER_START_TIMEOUT = 10.0 # seconds
+
+@functools.lru_cache(maxsize=1)
+def _yt_dlp_path():
+    """Locates yt-dlp once, preferring the copy installed beside this interpreter."""
+    import shutil
+    scripts_dir = str(Path(sys.executable).parent)
+    return shutil.which("yt-dlp", path=scripts_dir) or shutil.which("yt-dlp") or "yt-dlp"
+
+def _search_subprocess(query):
+    """Searches via the yt-dlp executable. Raises RuntimeError on failure."""
+    # Only needed on the search/spawn paths; control commands skip the import
+    import subprocess
+
+    command = [_yt_dlp_path(), "--print", "%(.{title,webpage_url})j", "--flat-playlist", f"ytsearch5:{query}"]
+    
+    # run() drains stdout and stderr together, so a chatty stderr can't block the child
+    result = subprocess.run(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,
+        stdin=subprocess.DEVNULL
+    )
+    
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"yt-dlp returned {result.returncode}\n"
+            f"Stderr: {result.stderr.decode('utf-8', 'replace')}"
+        )
+
+    # One JSON object per line, so titles need no delimiter escaping
+    results = []
+    for line in result.stdout.splitlines():
+        if line:
+            entry = loads(line)
+            results.append({"title": entry.get("title"), "url": entry.get("webpage_url")})
+    return results
+
+@functools.lru_cache(maxsize=1)
+def _get_ytdl():
+    """Returns one YoutubeDL instance shared by every search in this process."""
+    from yt_dlp import YoutubeDL
+    return YoutubeDL({"quiet": True, "no_warnings": True, "extract_flat": True, "skip_download": True})
+
+def _search_youtube(query):
+    """Returns the top 5 results as [{"title", "url"}]."""
+    try:
+        # In-process search skips a second interpreter start-up
+        ydl = _get_ytdl()
+    except ImportError:
+        return _search_subprocess(query)
+
+    info = ydl.extract_info(f"ytsearch5:{query}", download=False)
+
+    return [
+        {
+            "title": e.get("title"),
+            "url": e.get("webpage_url") or e.get("url") or f"https://www.youtube.com/watch?v={e['id']}"
+        }
+        for e in info.get("entries") or []
+    ]
 
 def cmd_search(args):
-    """Searches YouTube and stores results."""
+    """Searches YouTube, stores the results and returns them as text."""
     ensure_yit_dir()
     query = " ".join(args.query)
-    print(f"Searching for '{query}'...")
-
-    cmd = [
-        "yt-dlp",
-        "--print", "%(title)s|%(id)s",
-        "--flat-playlist",
-        f"ytsearch5:{query}"
-    ]
+    # Progress goes to stderr right away; stdout is the MCP protocol stream
+    print(f"Searching for '{query}'...", file=sys.stderr, flush=True)
+    out = []
 
+    results = []
     try:
-        yt_dlp_path = "yt-dlp"
-        
-        command = [str(yt_dlp_path), "--print", "%(title)s||||%(webpage_url)s", "--flat-playlist", f"ytsearch5:{query}"]
-        
-        result = subprocess.run(
-            command,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',
-            check=False,
-            stdin=subprocess.DEVNULL
-        )
-        
-        if result.returncode != 0:
-            print(f"Error: yt-dlp returned {result.returncode}")
-            print(f"Stderr: {result.stderr}")
-            return
-
-        if result.stdout is None:
-            print("Error: stdout is None")
-            return
-
-        lines = result.stdout.strip().split('\n')
-        results = []
-        print("\nResults:")
-        for i, line in enumerate(lines):
-            if "||||" in line:
-                 title, url = line.split("||||", 1)
-                 print(f"{i+1}. {title}")
-                 results.append({"title": title, "url": url})
+        results = get_cached_search(query)
+        if results is None:
+            results = _search_youtube(query)
+            if results:
+                cache_search(query, results)
         
         if not results:
-            print("No results found.")
-            return
+            out.append("No results found.")
+            return "\n".join(out)
+
+        out.append("\nResults:")
+        for i, track in enumerate(results):
+            out.append(f"{i+1}. {track['title']}")
 
-        with open(RESULTS_FILE, "w") as f:
-            json.dump(results, f, indent=4)
+        save_results(results)
 
+    except RuntimeError as e:
+        out.append(f"Error: {e}")
+        return "\n".join(out)
     except Exception as e:
-        print(f"Unexpected error: {e}\nTry running the setup_installer.bat")
+        out.append(f"Unexpected error: {e}\nTry running the setup_installer.bat")
 
     if getattr(args, 'play', False) and results:
-        print("\nAuto-playing result #1...")
-        cmd_play(SimpleNamespace(number=1))
+        out.append("\nAuto-playing result #1...")
+        # Already in memory: no need to round-trip through RESULTS_FILE
+        out.append(play_tracks(results[:1]))
+    return "\n".join(out)
+
+def _save_history_async(*tracks):
+    """Records tracks in history on a background thread; join() before exiting."""
+    t = threading.Thread(target=save_tracks_to_history, args=(tracks,), daemon=True)
+    t.start()
+    return t
+
+@functools.lru_cache(maxsize=1)
+def _player_env():
+    """Environment for MPV with our interpreter's Scripts dir (yt-dlp) first on PATH, built once."""
+    env = os.environ.copy()
+    yt_dlp_path = Path(sys.executable).parent
+    env["PATH"] = str(yt_dlp_path) + os.pathsep + env["PATH"]
+    return env
+
+def _wait_for_player(proc, timeout=PLAYER_START_TIMEOUT):
+    """Polls until a freshly spawned player answers on IPC, backing off from 10 ms to 0.5 s."""
+    delay = 0.01
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and proc.poll() is None:
+        if send_ipc_command({"command": ["get_property", "idle-active"]}) is not None:
+            return True
+        time.sleep(delay)
+        delay = min(delay * 1.5, 0.5)
+    return False
+
+def _spawn_player(tracks):
+    """Starts a detached MPV playing tracks and returns a status line."""
+    import subprocess
+    from .installer import get_mpv_path
+    mpv_exe = get_mpv_path()
+    cmd = [
+        mpv_exe,
+        "--no-video",
+        "--idle",
+        "--cache=yes",
+        "--prefetch-playlist=yes",
+        "--demuxer-max-bytes=128M",
+        "--demuxer-max-back-bytes=128M",
+        f"--input-ipc-server={IPC_PIPE}"
+    ]
+    
+    for t in tracks:
+        cmd.append(t["url"])
+
+    kwargs = {
+        "stdin": subprocess.DEVNULL,
+        "stdout": subprocess.DEVNULL,
+        "stderr": subprocess.DEVNULL,
+        "env": _player_env(),
+        # Closing inherited handles is cheap on POSIX but a costly scan on Windows
+        "close_fds": os.name != 'nt'
+    }
+
+    if os.name == 'nt':
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+
+    proc = subprocess.Popen(cmd, **kwargs)
+    if _wait_for_player(proc):
+        return "Player started in background."
+    return "Player launched, but it is not answering on IPC yet."
 
 def play_tracks(tracks):
-    """Plays a list of tracks (dicts with 'url' and 'title')."""
-    if not tracks: return
+    """Plays a list of tracks (dicts with 'url' and 'title') and returns a summary."""
+    if not tracks: return ""
 
     first_track = tracks[0]
-    print(f"Playing: {first_track['title']}")
+    out = [f"Playing: {first_track['title']}"]
     if len(tracks) > 1:
-        print(f"...and {len(tracks)-1} others queued.")
+        out.append(f"...and {len(tracks)-1} others queued.")
 
-    save_to_history(first_track)
-    
-    is_running = send_ipc_command({"command": ["get_property", "idle-active"]})
+    # The whole queue goes in one append so cmd_queue can name every entry
+    history = _save_history_async(*tracks)
     
-    if is_running and is_running.get("error") == "success":
-         print("Added to existing player.")
-         send_ipc_command({"command": ["loadfile", first_track["url"], "replace"]})
-         send_ipc_command({"command": ["set_property", "pause", False]})
-         
-         for t in tracks[1:]:
-             send_ipc_command({"command": ["loadfile", t["url"], "append"]})
+    # One pipelined write; no connection means the player isn't running
+    responses = send_ipc_batch(
+        [{"command": ["loadfile", first_track["url"], "replace"]},
+         {"command": ["set_property", "pause", False]}]
+        + [{"command": ["loadfile", t["url"], "append"]} for t in tracks[1:]]
+    )
+
+    if responses is not None:
+         out.append("Added to existing player.")
     else:
-        mpv_exe = get_mpv_path()
-        cmd = [
-            mpv_exe,
-            "--no-video",
-            "--idle",
-            "--cache=yes",
-            "--prefetch-playlist=yes",
-            "--demuxer-max-bytes=128M",
-            "--demuxer-max-back-bytes=128M",
-            f"--input-ipc-server={IPC_PIPE}"
-        ]
-        
-        for t in tracks:
-            cmd.append(t["url"])
-
-        env = os.environ.copy()
-        yt_dlp_path = Path(sys.executable).parent
-        env["PATH"] = str(yt_dlp_path) + os.pathsep + env["PATH"]
-
-        kwargs = {
-            "stdin": subprocess.DEVNULL,
-            "stdout": subprocess.DEVNULL,
-            "stderr": subprocess.DEVNULL,
-            "env": env,
-            "close_fds": True
-        }
-
-        if os.name == 'nt':
-            kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
-        else:
-            kwargs["start_new_session"] = True
+        out.append(_spawn_player(tracks))
 
-        subprocess.Popen(cmd, **kwargs)
-        print("Player started in background.")
+    history.join(timeout=2.0)
+    return "\n".join(out)
 
 def cmd_play(args):
     if not RESULTS_FILE.exists():
-        print("No search results found. Run 'yit search <query>' first.")
-        return
+        return "No search results found. Run 'yit search <query>' first."
 
     try:
-        with open(RESULTS_FILE, "r") as f:
-            results = json.load(f)
+        results = load_json(RESULTS_FILE)
         
         idx = args.number - 1
         if idx < 0 or idx >= len(results):
-            print("Invalid selection number.")
-            return
+            return "Invalid selection number."
 
         track = results[idx]
-        play_tracks([track])
+        return play_tracks([track])
 
     except Exception as e:
-        print(f"Error playing: {e}")
+        return f"Error playing: {e}"
 
 def cmd_pause(args):
-    send_ipc_command({"command": ["set_property", "pause", True]})
-    print("Paused.")
+    send_ipc_command({"command": ["set_property", "pause", True]}, wait=False)
+    return "Paused."
 
 def cmd_resume(args):
-    send_ipc_command({"command": ["set_property", "pause", False]})
-    print("Resumed.")
+    send_ipc_command({"command": ["set_property", "pause", False]}, wait=False)
+    return "Resumed."
     
 def cmd_toggle(args):
-    send_ipc_command({"command": ["cycle", "pause"]})
-    print("Toggled playback.")
+    send_ipc_command({"command": ["cycle", "pause"]}, wait=False)
+    return "Toggled playback."
 
 def cmd_stop(args):
-    send_ipc_command({"command": ["quit"]})
-    print("Stopped.")
+    send_ipc_command({"command": ["quit"]}, wait=False)
+    return "Stopped."
 
 def cmd_loop(args):
-    send_ipc_command({"command": ["set_property", "loop-file", "inf"]})
-    print("Looping current track.")
+    send_ipc_command({"command": ["set_property", "loop-file", "inf"]}, wait=False)
+    return "Looping current track."
 
 def cmd_unloop(args):
-    send_ipc_command({"command": ["set_property", "loop-file", "no"]})
-    print("Unlooped. Playback will continue normally.")
+    send_ipc_command({"command": ["set_property", "loop-file", "no"]}, wait=False)
+    return "Unlooped. Playback will continue normally."
 
 def cmd_add(args):
     if not RESULTS_FILE.exists():
-        print("No search results found. Run 'yit search <query>' first.")
-        return
+        return "No search results found. Run 'yit search <query>' first."
 
     try:
-        with open(RESULTS_FILE, "r") as f:
-            results = json.load(f)
+        results = load_json(RESULTS_FILE)
         
         idx = args.number - 1
         if idx < 0 or idx >= len(results):
-            print("Invalid selection number.")
-            return
+            return "Invalid selection number."
 
         track = results[idx]
-        print(f"Adding to queue: {track['title']}")
-        save_to_history(track)
+        out = [f"Adding to queue: {track['title']}"]
+        history = _save_history_async(track)
         
         res = send_ipc_command({"command": ["loadfile", track["url"], "append-play"]})
         
-        if not res or res.get("error") != "success":
-            print("Player not running (or append failed), starting new queue...")
-            cmd_play(args)
+        if res is None:
+            # No player to probe again: start one with this track directly
+            out.append("Player not running, starting new queue...")
+            out.append(_spawn_player([track]))
+        elif res.get("error") == "timeout":
+            # MPV got the command and may still run it; replacing the queue would drop the current track
+            out.append("Player is not responding; the track may still be added.")
+        elif res.get("error") != "success":
+            out.append("Append failed, starting new queue...")
+            out.append(play_tracks([track]))
         else:
-            print("Added to queue.")
+            out.append("Added to queue.")
+
+        history.join(timeout=2.0)
+        return "\n".join(out)
 
     except Exception as e:
-        print(f"Error adding to queue: {e}")
+        return f"Error adding to queue: {e}"
 
 def cmd_next(args):
-    send_ipc_command({"command": ["playlist-next"]})
-    print("Skipping to next track...")
+    send_ipc_command({"command": ["playlist-next"]}, wait=False)
+    return "Skipping to next track..."
 
 def cmd_prev(args):
-    send_ipc_command({"command": ["playlist-prev"]})
-    print("Going to previous track...")
+    send_ipc_command({"command": ["playlist-prev"]}, wait=False)
+    return "Going to previous track..."
 
 def cmd_restart(args):
-    send_ipc_command({"command": ["seek", 0, "absolute"]})
-    send_ipc_command({"command": ["set_property", "pause", False]})
-    print("Restarting current track...")
+    send_ipc_batch([
+        {"command": ["seek", 0, "absolute"]},
+        {"command": ["set_property", "pause", False]}
+    ], wait=False)
+    return "Restarting current track..."
 
 def cmd_clear(args):
-    send_ipc_command({"command": ["playlist-clear"]})
-    print("Queue cleared.")
+    send_ipc_command({"command": ["playlist-clear"]}, wait=False)
+    return "Queue cleared."
+
+# cmd_queue's title lookups, reused while results and history are unchanged
+_title_maps_key = None # (results, history) file keys
+_url_titles = {}
+_id_titles = None # derived from _url_titles on first need
+
+def _file_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _url_title_map():
+    """Maps URLs from results and history to titles, rebuilt only when either file changes."""
+    global _title_maps_key, _url_titles, _id_titles
+    key = (_file_key(RESULTS_FILE), _file_key(HISTORY_FILE))
+    if key != _title_maps_key:
+        results = []
+        if key[0]:
+            try:
+                results = load_json(RESULTS_FILE)
+            except Exception: pass
+
+        # One streaming pass over results then history (later entries win)
+        url_map = {}
+        for item in itertools.chain(results, iter_history()):
+            try:
+                url_map[item["url"].strip("| ")] = item["title"]
+            except (KeyError, TypeError, AttributeError):
+                pass # Malformed entry (missing title, null url): skip it
+        _title_maps_key, _url_titles, _id_titles = key, url_map, None
+    return _url_titles
+
+def _id_title_map(url_map):
+    """Maps video IDs to titles for url_map, cached while it is the current _url_title_map()."""
+    global _id_titles
+    if url_map is _url_titles and _id_titles is not None:
+        return _id_titles
+
+    id_map = {}
+    for url, title in url_map.items():
+        vid = extract_video_id(url)
+        if vid:
+            id_map[vid] = title
+    if url_map is _url_titles:
+        _id_titles = id_map
+    return id_map
 
 def cmd_queue(args):
     resp = get_ipc_property("playlist")
     if not resp or resp.get("error") != "success":
-        print("Queue is empty (or player not running).")
-        return
+        return "Queue is empty (or player not running)."
 
     playlist = resp.get("data", [])
     if not playlist:
-        print("Queue is empty.")
-        return
+        return "Queue is empty."
     
+    # Titles only need looking up for entries MPV hasn't named yet
+    untitled = [item.get("filename", "") for item in playlist if not item.get("title")]
     url_map = {}
     id_map = {}
-    
-    def load_into_maps(items):
-        for item in items:
-            url = item["url"].strip("| ")
-            title = item["title"]
-            url_map[url] = title
-            vid = extract_video_id(url)
-            if vid:
-                id_map[vid] = title
-
-    if RESULTS_FILE.exists():
-        try:
-            with open(RESULTS_FILE, "r") as f:
-                load_into_maps(json.load(f))
-        except Exception: pass
-
-    if HISTORY_FILE.exists():
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                load_into_maps(json.load(f))
-        except Exception: pass
+    if untitled:
+        url_map = _url_title_map()
+        # Video-ID matching is only needed when an exact URL lookup misses
+        if any(url not in url_map for url in untitled):
+            id_map = _id_title_map(url_map)
 
-    print("\nCurrent Queue:")
+    out = ["\nCurrent Queue:"]
     for i, item in enumerate(playlist):
         prefix = "-> " if item.get("current") else "   "
         
@@ -270,27 +387,30 @@ def cmd_queue(args):
                 else:
                     title = url or "Unknown"
 
-        print(f"{prefix}{i+1}. {title}")
+        out.append(f"{prefix}{i+1}. {title}")
+    return "\n".join(out)
+
+def _data(resp):
+    """Returns an IPC response's data, or None if the request failed."""
+    return resp.get("data") if resp and resp.get("error") == "success" else None
 
 def cmd_status(args):
-    resp = get_ipc_property("media-title")
-    if resp and resp.get("error") == "success" and resp.get("data"):
-        title = resp.get("data")
-        
-        paused = get_ipc_property("pause")
-        looping = get_ipc_property("loop-file")
+    props = batch_get(["media-title", "pause", "loop-file", "idle-active"])
 
-        status_str = "[Paused]" if paused and paused.get("data") else "[Playing]"
+    title = _data(props["media-title"])
+    if title:
+        status_str = "[Paused]" if _data(props["pause"]) else "[Playing]"
         
-        if looping and looping.get("data") in ["inf", "yes"]:
+        if _data(props["loop-file"]) in ("inf", "yes"):
             status_str += " [Looped]"
             
-        print(f"{status_str} {title}")
-    else:
-        if get_ipc_property("idle-active"): 
-             print("Queue is empty.")
-        else:
-             print("Yit is not running.")
+        return f"{status_str} {title}"
+    idle = props["idle-active"]
+    if idle and idle.get("error") == "timeout":
+        return "Player is not responding."
+    if idle:
+        return "Queue is empty."
+    return "Yit is not running."
             
 def cmd_agent(args):
     state = {
@@ -303,44 +423,39 @@ def cmd_agent(args):
         "queue_length": 0
     }
 
-    idle_resp = get_ipc_property("idle-active")
-    if not idle_resp:
-        print(json.dumps(state, indent=2))
-        return
-
-    pause_resp = get_ipc_property("pause")
-    title_resp = get_ipc_property("media-title")
-    path_resp = get_ipc_property("path")
-    time_resp = get_ipc_property("time-pos")
-    dur_resp = get_ipc_property("duration")
-    vol_resp = get_ipc_property("volume")
-    loop_resp = get_ipc_property("loop-file")
-    playlist_resp = get_ipc_property("playlist-count")
-
-    if pause_resp and pause_resp.get("data") is True:
+    # The liveness probe rides in the same batch: one round trip in total
+    props = batch_get([
+        "idle-active", "pause", "media-title", "path", "time-pos",
+        "duration", "volume", "loop-file", "playlist-count"
+    ])
+
+    if not props["idle-active"]:
+        return dumps(state, indent=True).decode("utf-8")
+    if props["idle-active"].get("error") == "timeout":
+        # A hung player must not look like a stopped one
+        state["status"] = "not_responding"
+        return dumps(state, indent=True).decode("utf-8")
+
+    paused = _data(props["pause"])
+    if paused is True:
         state["status"] = "paused"
-    elif pause_resp and pause_resp.get("data") is False:
+    elif paused is False:
         state["status"] = "playing"
 
-    if title_resp and title_resp.get("data"):
-        state["track"]["title"] = title_resp["data"]
-    if path_resp and path_resp.get("data"):
-        state["track"]["url"] = path_resp["data"]
-
-    if time_resp and time_resp.get("data"):
-        state["position"] = time_resp["data"]
-    if dur_resp and dur_resp.get("data"):
-        state["duration"] = dur_resp["data"]
-    if vol_resp and vol_resp.get("data"):
-        state["volume"] = vol_resp["data"]
-    
-    if loop_resp and loop_resp.get("data") in ["inf", "yes"]:
-        state["loop"] = True
-    
-    if playlist_resp and playlist_resp.get("data"):
-        state["queue_length"] = playlist_resp["data"]
+    title = _data(props["media-title"])
+    if title:
+        state["track"]["title"] = title
+    path = _data(props["path"])
+    if path:
+        state["track"]["url"] = path
 
-    print(json.dumps(state, indent=2))
+    state["position"] = _data(props["time-pos"]) or 0
+    state["duration"] = _data(props["duration"]) or 0
+    state["volume"] = _data(props["volume"]) or 0
+    state["loop"] = _data(props["loop-file"]) in ("inf", "yes")
+    state["queue_length"] = _data(props["playlist-count"]) or 0
+
+    return dumps(state, indent=True).decode("utf-8")
 
 def cmd_commands(args):
     cmds = [
@@ -362,88 +477,77 @@ def cmd_commands(args):
         {"cmd": "0", "usage": "yit 0", "desc": "Replay current track."},
         {"cmd": "fav", "usage": "yit fav [add|play|list|remove]", "desc": "Manage favorites."}
     ]
-    print(json.dumps(cmds, indent=2))
+    return dumps(cmds, indent=True).decode("utf-8")
 
 def cmd_fav(args):
-    favs = load_favorites()
+    favs, fav_urls = load_favorites()
 
     if args.action == "list":
         if not favs:
-            print("No favorites yet.")
-            return
-        print("\nFavorites:")
+            return "No favorites yet."
+        out = ["\nFavorites:"]
         for i, track in enumerate(favs):
-            print(f"{i+1}. {track['title']}")
+            out.append(f"{i+1}. {track['title']}")
+        return "\n".join(out)
     
     elif args.action == "add":
         track_to_add = None
         
         if args.target:
              if not RESULTS_FILE.exists():
-                print("No search results found.")
-                return
+                return "No search results found."
              try:
-                 with open(RESULTS_FILE, "r") as f:
-                     results = json.load(f)
+                 results = load_json(RESULTS_FILE)
                  idx = int(args.target) - 1
                  if 0 <= idx < len(results):
                      track_to_add = results[idx]
                  else:
-                     print("Invalid index.")
-                     return
+                     return "Invalid index."
              except Exception as e:
-                 print(f"Error reading results: {e}")
-                 return
+                 return f"Error reading results: {e}"
         
         else:
-            path_resp = get_ipc_property("path")
-            title_resp = get_ipc_property("media-title")
+            props = batch_get(["path", "media-title"])
+            path, title = _data(props["path"]), _data(props["media-title"])
             
-            if path_resp and path_resp.get("data") and title_resp and title_resp.get("data"):
-                 track_to_add = {"title": title_resp["data"], "url": path_resp["data"]}
+            if path and title:
+                 track_to_add = {"title": title, "url": path}
             else:
-                print("No track selected or playing. Specify an index from search results or play a song first.")
-                return
+                return "No track selected or playing. Specify an index from search results or play a song first."
 
-        if track_to_add:
-            if any(f["url"] == track_to_add["url"] for f in favs):
-                print(f"Already in favorites: {track_to_add['title']}")
-            else:
-                favs.append(track_to_add)
-                save_favorites(favs)
-                print(f"Added to favorites: {track_to_add['title']}")
+        if track_to_add["url"] in fav_urls:
+            return f"Already in favorites: {track_to_add['title']}"
+        add_favorite(track_to_add)
+        return f"Added to favorites: {track_to_add['title']}"
 
     elif args.action == "remove":
         if not args.target:
-            print("Specify an index to remove (run 'yit fav list').")
-            return
+            return "Specify an index to remove (run 'yit fav list')."
         try:
             idx = int(args.target) - 1
             if 0 <= idx < len(favs):
                 removed = favs.pop(idx)
                 save_favorites(favs)
-                print(f"Removed: {removed['title']}")
+                return f"Removed: {removed['title']}"
             else:
-                print("Invalid index.")
+                return "Invalid index."
         except ValueError:
-            print("Invalid index found (must be a number).")
+            return "Invalid index found (must be a number)."
 
     elif args.action == "play":
         if not favs:
-            print("No favorites to play.")
-            return
+            return "No favorites to play."
 
         if args.target:
             try:
                 idx = int(args.target) - 1
                 if 0 <= idx < len(favs):
                     track = favs[idx]
-                    play_tracks([track])
+                    return play_tracks([track])
                 else:
-                    print("Invalid index.")
+                    return "Invalid index."
             except ValueError:
-                print("Invalid index.")
+                return "Invalid index."
         
         else:
-            print(f"Playing all {len(favs)} favorites...")
-            play_tracks(favs)
+            return f"Playing all {len(favs)} favorites...\n" + play_tracks(favs)
@@ -4,14 +4,22 @@ from pathlib import Path
 YIT_DIR = Path.home() / ".yit"
 YIT_BIN = YIT_DIR / "bin"
 RESULTS_FILE = YIT_DIR / "results.json"
-HISTORY_FILE = YIT_DIR / "history.json"
-FAV_FILE = YIT_DIR / "favorites.json"
+HISTORY_FILE = YIT_DIR / "history.ndjson"
+HISTORY_INDEX_FILE = YIT_DIR / "history_urls.txt"
+LEGACY_HISTORY_FILE = YIT_DIR / "history.json"
+FAV_FILE = YIT_DIR / "favorites.ndjson"
+LEGACY_FAV_FILE = YIT_DIR / "favorites.json"
 UPDATE_FILE = YIT_DIR / "update.json"
+MPV_PATH_CACHE = YIT_DIR / "mpv_path"
+SEARCH_CACHE_FILE = YIT_DIR / "search_cache.json"
+RELEASE_CACHE_FILE = YIT_DIR / "mpv_release.json"
+
+# Lifetime of on-disk lookups (update check, search results, MPV release)
+CACHE_TTL = 86400 # 24h
 
 IPC_PIPE = str(YIT_DIR / "socket")
 if os.name == 'nt':
     IPC_PIPE = r"\\.\pipe\yit_socket"
 
 def ensure_yit_dir():
-    if not YIT_DIR.exists():
-        YIT_DIR.mkdir()
+    YIT_DIR.mkdir(exist_ok=True)
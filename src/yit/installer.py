@@ -1,99 +1,320 @@
+import functools
 import os
 import shutil
-import platform
 import subprocess
-import requests
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPSConnection, HTTPException
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+from urllib.request import Request, getproxies, proxy_bypass, urlopen
 
-from .config import YIT_BIN
+from .config import YIT_BIN, MPV_PATH_CACHE, RELEASE_CACHE_FILE, CACHE_TTL, ensure_yit_dir
+from .jsonio import dumps, loads
+from .storage import atomic_write
 
+DOWNLOAD_CHUNK = 1 << 20
+DOWNLOAD_SHARD = 8 << 20
+DOWNLOAD_WORKERS = 8
+
+# Archive formats in order of preference; tarballs can be decoded on all cores
+ARCHIVE_SUFFIXES = (".tar.zst", ".tar.xz", ".7z")
+TAR_DECOMPRESSORS = {".tar.xz": ["xz", "-d", "-T0"], ".tar.zst": ["zstd", "-d"]}
+# tar's built-in filters, used when the standalone decompressor is missing
+TAR_FILTER_FLAGS = {".tar.xz": "-J", ".tar.zst": "--zstd"}
+
+def _remember_mpv_path(path):
+    """Persists the resolved MPV path so later runs skip the PATH scan."""
+    try:
+        ensure_yit_dir()
+        atomic_write(MPV_PATH_CACHE, path.encode("utf-8"))
+    except OSError:
+        pass
+    return path
+
+@functools.lru_cache(maxsize=1)
 def get_mpv_path():
-    """Finds MPV or installs it (Windows only)."""
+    """Finds MPV or installs it (Windows only). Resolved once per process."""
+    # 0. Path resolved by a previous run
+    try:
+        cached = MPV_PATH_CACHE.read_text().strip()
+        if cached and os.path.exists(cached):
+            return cached
+    except OSError:
+        pass
+
     # 1. Check local bin (Windows priority for portability)
     if os.name == 'nt':
         local_mpv = YIT_BIN / "mpv.exe"
         if local_mpv.exists():
-            return str(local_mpv)
+            return _remember_mpv_path(str(local_mpv))
 
     # 2. Check PATH
-    if shutil.which("mpv"):
-        return "mpv"
+    found = shutil.which("mpv")
+    if found:
+        return _remember_mpv_path(found)
 
     # 3. Not found.
+    import platform
     system = platform.system()
     if system == "Windows":
-        print("MPV not found. Downloading portable MPV for Windows...")
-        return download_mpv_windows()
+        print("MPV not found. Downloading portable MPV for Windows...", file=sys.stderr)
+        return _remember_mpv_path(download_mpv_windows())
     elif system == "Darwin":
-        print("MPV is required. Please run: brew install mpv")
+        print("MPV is required. Please run: brew install mpv", file=sys.stderr)
         sys.exit(1)
     else:
-        print("MPV is required. Please install it (e.g., sudo apt install mpv).")
+        print("MPV is required. Please install it (e.g., sudo apt install mpv).", file=sys.stderr)
         sys.exit(1)
 
+def _extract(archive, dest, members=None):
+    """Extracts archive into dest using a native, multi-threaded tool when available.
+
+    If members is given, only those file names are extracted.
+    """
+    members = list(members or [])
+    archive = str(archive)
+    if archive.endswith(".7z"):
+        seven_zip = shutil.which("7z") or shutil.which("7zz")
+        if seven_zip:
+            try:
+                cmd = [seven_zip, "x", archive, f"-o{dest}", "-mmt=on", "-y"]
+                if members:
+                    cmd += members + ["-r"]
+                subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+                return
+            except subprocess.CalledProcessError as e:
+                print(f"7-Zip failed ({e}), falling back to tar...", file=sys.stderr)
+
+    print("Extracting (using system tar)...", file=sys.stderr)
+    subprocess.run(_tar_command(archive, archive, dest) + members, check=True, stdout=subprocess.DEVNULL)
+
+def _tar_command(name, source, dest):
+    """Builds a tar extract command for source ('-' for stdin), picking the decompressor from name."""
+    # Modern Windows (10 build 17063+) ships bsdtar as tar.exe
+    tar = shutil.which("bsdtar") or shutil.which("tar")
+    if not tar:
+        raise Exception("No archive tool found (need 7-Zip or tar).")
+    cmd = [tar, "-xf", source, "-C", str(dest)]
+    for suffix, program in TAR_DECOMPRESSORS.items():
+        if name.endswith(suffix):
+            if shutil.which(program[0]):
+                cmd.insert(1, f"--use-compress-program={' '.join(program)}")
+            elif source == "-":
+                # Compression can't be sniffed from a pipe by every tar
+                cmd.insert(1, TAR_FILTER_FLAGS[suffix])
+    return cmd
+
+def _stream_extract(url, name, dest):
+    """Pipes a tarball download straight into tar, so the archive never touches the disk."""
+    cmd = _tar_command(name, "-", dest)
+    with urlopen(Request(url, headers={"Accept-Encoding": "identity"})) as r:
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+        try:
+            shutil.copyfileobj(r, proc.stdin, DOWNLOAD_CHUNK)
+        finally:
+            proc.stdin.close()
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+def _find_file(root, name):
+    """Returns the first file called name under root (shallowest first), or None."""
+    for dirpath, _, filenames in os.walk(root):
+        if name in filenames:
+            return Path(dirpath) / name
+    return None
+
+# Each download worker keeps its own keep-alive connection per host
+_worker = threading.local()
+# Every connection handed out, so _close_connections() can reach other threads' ones
+_all_conns = []
+_all_conns_lock = threading.Lock()
+
+def _proxied(url):
+    """True if urllib would route url through a proxy, which raw http.client connections ignore."""
+    parts = urlsplit(url)
+    return parts.scheme in getproxies() and not proxy_bypass(parts.hostname or "")
+
+def _worker_connection(url):
+    """Returns (connection, request target) reusing this thread's connection to url's host."""
+    parts = urlsplit(url)
+    conns = _worker.__dict__.setdefault("conns", {})
+    key = (parts.scheme, parts.netloc)
+    if key not in conns:
+        cls = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+        conns[key] = cls(parts.netloc, timeout=30)
+        with _all_conns_lock:
+            _all_conns.append(conns[key])
+    target = parts.path + ("?" + parts.query if parts.query else "")
+    return conns[key], target
+
+def _close_connections():
+    """Closes every keep-alive connection opened by _worker_connection()."""
+    with _all_conns_lock:
+        conns = _all_conns[:]
+        _all_conns.clear()
+    for conn in conns:
+        conn.close()
+    _worker.__dict__.pop("conns", None)
+
+class _RangeNotSupported(Exception):
+    """A shard request came back without 206 Partial Content."""
+
+def _fetch_range(url, path, start, end):
+    """Downloads bytes [start, end] of url into the same offset of path."""
+    # Archives are already compressed; don't let a proxy re-encode them
+    headers = {"Range": f"bytes={start}-{end}", "Accept-Encoding": "identity"}
+    conn, target = _worker_connection(url)
+    for attempt in range(2):
+        try:
+            conn.request("GET", target, headers=headers)
+            r = conn.getresponse()
+            break
+        except (HTTPException, OSError):
+            conn.close() # Server dropped the idle connection; reconnect once
+            if attempt:
+                raise
+    if r.status != 206:
+        conn.close()
+        raise _RangeNotSupported("Server ignored range request.")
+    with open(path, "r+b") as f:
+        f.seek(start)
+        shutil.copyfileobj(r, f, DOWNLOAD_CHUNK)
+
+def _head(url, max_redirects=5):
+    """Sends a HEAD request, following redirects, and returns (final url, headers).
+
+    urllib re-sends a redirected HEAD as a GET, which would start fetching the
+    whole asset (GitHub download URLs always redirect), so this uses http.client.
+    """
+    for _ in range(max_redirects + 1):
+        conn, target = _worker_connection(url)
+        conn.request("HEAD", target, headers={"Accept-Encoding": "identity"})
+        r = conn.getresponse()
+        r.read()
+        location = r.getheader("Location")
+        if r.status in (301, 302, 303, 307, 308) and location:
+            url = urljoin(url, location)
+            continue
+        if r.status >= 400:
+            raise Exception(f"HTTP {r.status} for {url}")
+        return url, r.headers
+    raise Exception(f"Too many redirects for {url}")
+
+def _download(url, path):
+    """Downloads url to path, fetching byte ranges in parallel when supported."""
+    # Behind a proxy only urllib knows the route, so use its single stream
+    if not _proxied(url):
+        try:
+            try:
+                # Resolved URL, so shards skip the redirect
+                url, headers = _head(url)
+            except Exception:
+                headers = {} # No usable probe (HEAD refused, odd redirects): stream instead
+            size = int(headers.get("Content-Length", 0))
+            ranged = headers.get("Accept-Ranges") == "bytes"
+
+            if size > DOWNLOAD_SHARD and ranged:
+                with open(path, "wb") as f:
+                    f.truncate(size)
+                shards = [(a, min(a + DOWNLOAD_SHARD, size) - 1) for a in range(0, size, DOWNLOAD_SHARD)]
+                try:
+                    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as ex:
+                        list(ex.map(lambda s: _fetch_range(url, path, *s), shards))
+                    return
+                except _RangeNotSupported:
+                    pass # Advertised but not honoured; the stream below rewrites the file
+        finally:
+            _close_connections()
+
+    with urlopen(Request(url, headers={"Accept-Encoding": "identity"})) as r, open(path, 'wb') as f:
+        shutil.copyfileobj(r, f, DOWNLOAD_CHUNK)
+
+def _latest_mpv_url():
+    """Returns the preferred MPV build URL, reusing a lookup younger than CACHE_TTL."""
+    try:
+        with open(RELEASE_CACHE_FILE, "rb") as f:
+            data = loads(f.read())
+        if time.time() - data["ts"] < CACHE_TTL:
+            return data["url"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    print("Fetching latest MPV release info...", file=sys.stderr)
+    api_url = "https://api.github.com/repos/shinchiro/mpv-winbuild-cmake/releases/latest"
+    with urlopen(api_url) as resp:
+        assets = loads(resp.read()).get("assets", [])
+
+    # Prefer multi-threaded archive formats, then main build (mpv-x86_64...) over dev
+    for suffix in ARCHIVE_SUFFIXES:
+        builds = [a for a in assets if a["name"].startswith("mpv-x86_64") and a["name"].endswith(suffix)]
+        builds = [a for a in builds if "v3" in a["name"]] or builds
+        if builds:
+            url = builds[0]["browser_download_url"]
+            try:
+                atomic_write(RELEASE_CACHE_FILE, dumps({"ts": time.time(), "url": url}))
+            except OSError:
+                pass
+            return url
+    return None
+
 def download_mpv_windows():
     if not YIT_BIN.exists(): YIT_BIN.mkdir(parents=True, exist_ok=True)
     
     try:
-        # Fetch latest release
-        print("Fetching latest MPV release info...")
-        api_url = "https://api.github.com/repos/shinchiro/mpv-winbuild-cmake/releases/latest"
-        resp = requests.get(api_url)
-        resp.raise_for_status()
-        assets = resp.json().get("assets", [])
-        
-        url = None
-        # Prefer main build (mpv-x86_64...) over dev
-        for asset in assets:
-            if asset["name"].startswith("mpv-x86_64") and asset["name"].endswith(".7z") and "v3" in asset["name"]:
-                url = asset["browser_download_url"]
-                break
-        
-        if not url:
-            for asset in assets:
-                 if asset["name"].startswith("mpv-x86_64") and asset["name"].endswith(".7z"):
-                    url = asset["browser_download_url"]
-                    break
-        
+        url = _latest_mpv_url()
         if not url:
-            raise Exception("No suitable MPV build (mpv-x86_64*.7z) found in latest release.")
-
-        print(f"Downloading {url}...")
-        archive_path = YIT_BIN / "mpv.7z"
-        with requests.get(url, stream=True) as r:
-            r.raise_for_status()
-            with open(archive_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-        
-        print("Extracting...")
-        print("Extracting (using system tar)...")
+            raise Exception("No suitable MPV build (mpv-x86_64 archive) found in latest release.")
+        suffix = next(s for s in ARCHIVE_SUFFIXES if url.endswith(s))
+
+        # Tarballs are decompressed while downloading instead of round-tripping through disk
+        archive_path = None
+        if suffix in TAR_DECOMPRESSORS:
+            print(f"Downloading and extracting {url}...", file=sys.stderr)
+        else:
+            print(f"Downloading {url}...", file=sys.stderr)
+            archive_path = YIT_BIN / ("mpv" + suffix)
+            _download(url, archive_path)
+            print("Extracting...", file=sys.stderr)
+
         try:
-            # Modern Windows (10 build 17063+) has native tar
-            subprocess.run(["tar", "-xf", str(archive_path), "-C", str(YIT_BIN)], check=True)
+            if not archive_path:
+                _stream_extract(url, suffix, YIT_BIN)
+            else:
+                # Only mpv.exe is needed; skip decoding the rest of the archive
+                try:
+                    _extract(archive_path, YIT_BIN, members=["mpv.exe"])
+                except subprocess.CalledProcessError:
+                    pass
+            mpv_exe = _find_file(YIT_BIN, "mpv.exe")
+            if not mpv_exe and archive_path:
+                _extract(archive_path, YIT_BIN)
+                mpv_exe = _find_file(YIT_BIN, "mpv.exe")
         except Exception as e:
-             print(f"Error extracting: {e}")
-             print("Please install standard 7-Zip or run 'winget install mpv.mpv'")
+             print(f"Error extracting: {e}", file=sys.stderr)
+             print("Please install standard 7-Zip or run 'winget install mpv.mpv'", file=sys.stderr)
              sys.exit(1)
             
-        # Flatten: Find mpv.exe and move to YIT_BIN
-        found = list(YIT_BIN.rglob("mpv.exe"))
-        if not found:
+        # Flatten: Move mpv.exe to YIT_BIN
+        if not mpv_exe:
             raise Exception("mpv.exe not found in extracted archive.")
             
-        mpv_exe = found[0]
         if mpv_exe.parent != YIT_BIN:
-            print(f"Moving {mpv_exe} to {YIT_BIN}...")
-            shutil.move(str(mpv_exe), str(YIT_BIN / "mpv.exe"))
+            print(f"Moving {mpv_exe} to {YIT_BIN}...", file=sys.stderr)
+            # Same directory tree, so this is a rename rather than a byte copy
+            os.replace(mpv_exe, YIT_BIN / "mpv.exe")
             
-        try:
-            os.remove(archive_path)
-        except: pass
+        if archive_path:
+            try:
+                os.remove(archive_path)
+            except: pass
         
-        print("MPV installed successfully.")
+        print("MPV installed successfully.", file=sys.stderr)
         return str(YIT_BIN / "mpv.exe")
         
     except Exception as e:
-        print(f"Failed to auto-install MPV: {e}")
-        print("Please install it manually via 'winget install mpv.mpv'")
+        print(f"Failed to auto-install MPV: {e}", file=sys.stderr)
+        print("Please install it manually via 'winget install mpv.mpv'", file=sys.stderr)
         sys.exit(1)
@@ -1,28 +1,42 @@
+import atexit
 import os
 import socket
-import json
+import itertools
+import threading
+import time
 from .config import IPC_PIPE
+from .jsonio import dumps, loads
+
+READ_SIZE = 4096
+# Upper bound on waiting for MPV's replies to one request, so a stalled player can't hang every command
+IPC_TIMEOUT = 0.5 # seconds
+# Windows pipe polling yields with sleep(0) this long before sleeping (coarse before Python 3.11)
+PIPE_SPIN = 0.002 # seconds
 
 class SocketWrapper:
-    """Wraps a socket to behave like a file object (read/write/flush)."""
+    """Gives a socket the write/flush/read interface of PipeWrapper.
+
+    Calls go straight to sendall()/recv(); no makefile() layer in between.
+    """
     def __init__(self, sock):
         self.sock = sock
-        self.r_file = sock.makefile("rb", buffering=0)
-        self.w_file = sock.makefile("wb", buffering=0)
 
     def write(self, data):
-        self.w_file.write(data)
+        self.sock.sendall(data)
 
     def flush(self):
-        self.w_file.flush()
+        pass # Unbuffered: sendall() already delivered everything
 
-    def readline(self):
-        return self.r_file.readline()
+    def read(self, size, timeout):
+        """Reads up to size bytes, raising socket.timeout after timeout seconds."""
+        self.sock.settimeout(timeout)
+        try:
+            return self.sock.recv(size)
+        finally:
+            self.sock.settimeout(IPC_TIMEOUT) # Keep writes bounded as well
 
     def close(self):
         try:
-            self.r_file.close()
-            self.w_file.close()
             self.sock.close()
         except: pass
 
@@ -32,46 +46,224 @@ class SocketWrapper:
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
 
+class PipeWrapper:
+    """Windows named pipe whose reads give up after IPC_TIMEOUT.
+
+    Pipe reads can't time out on their own, so read() polls PeekNamedPipe
+    (through ctypes) until MPV has written something, spinning briefly
+    before it starts sleeping.
+    """
+    def __init__(self, f):
+        import ctypes
+        import msvcrt
+        from ctypes import wintypes
+        self.f = f
+        self._handle = msvcrt.get_osfhandle(f.fileno())
+        self._available = wintypes.DWORD()
+        self._available_ref = ctypes.byref(self._available)
+        self._peek = ctypes.windll.kernel32.PeekNamedPipe
+        self._peek.argtypes = [
+            wintypes.HANDLE, wintypes.LPVOID, wintypes.DWORD,
+            wintypes.LPDWORD, wintypes.LPDWORD, wintypes.LPDWORD
+        ]
+        self._peek.restype = wintypes.BOOL
+
+    def write(self, data):
+        self.f.write(data)
+
+    def flush(self):
+        pass # Opened unbuffered
+
+    def read(self, size, timeout):
+        """Reads up to size bytes, raising socket.timeout after timeout seconds."""
+        now = time.monotonic()
+        deadline = now + timeout
+        spin_until = now + PIPE_SPIN
+        delay = 0.001
+        while True:
+            if not self._peek(self._handle, None, 0, None, self._available_ref, None):
+                return b"" # Pipe closed by MPV
+            if self._available.value:
+                return self.f.read(min(size, self._available.value))
+            now = time.monotonic()
+            if now >= deadline:
+                raise socket.timeout("timed out")
+            if now < spin_until:
+                # MPV usually answers within a few ms; a real sleep could round up to ~15 ms
+                time.sleep(0)
+            else:
+                time.sleep(min(delay, deadline - now))
+                delay = min(delay * 2, 0.02)
+
+    def close(self):
+        try:
+            self.f.close()
+        except: pass
+
 def connect_ipc():
     """Connects to the MPV IPC."""
     if os.name == 'nt':
-        return open(IPC_PIPE, "r+b", buffering=0)
+        return PipeWrapper(open(IPC_PIPE, "r+b", buffering=0))
     else:
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(IPC_TIMEOUT)
         sock.connect(IPC_PIPE)
         return SocketWrapper(sock)
 
-def send_ipc_command(command):
-    """Sends a JSON-formatted command to the MPV IPC pipe."""
-    try:
-        with connect_ipc() as f:
-            payload = json.dumps(command).encode("utf-8") + b"\n"
-            f.write(payload)
-            f.flush() # Essential for socket
-            response_line = f.readline().decode("utf-8")
-            if response_line:
-                return json.loads(response_line)
-            return {"error": "no_response"}
-    except (FileNotFoundError, ConnectionRefusedError, OSError):
-        # On Linux, OSError might be "Connection refused" or "No such file"
-        return None
-    except Exception as e:
-        print(f"Error communicating with player: {e}")
+class MpvIpc:
+    """One IPC connection that pipelines several requests per round trip."""
+    def __init__(self):
+        self.f = None
+        self._buf = b""
+        self._ids = itertools.count(1)
+
+    def connect(self):
+        try:
+            self.f = connect_ipc()
+        except OSError:
+            self.f = None
+        return self
+
+    def close(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+        self._buf = b""
+
+    def _readline(self, deadline):
+        """Returns the next reply line, draining the pipe in bulk reads.
+
+        Raises socket.timeout once deadline (a time.monotonic() value) passes.
+        """
+        while b"\n" not in self._buf:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout("timed out")
+            chunk = self.f.read(READ_SIZE, remaining)
+            if not chunk:
+                return b""
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\n", 1)
+        return line
+
+    def send(self, commands):
+        """Writes commands without waiting for replies. Returns False if nothing was sent."""
+        if not self.f:
+            return False
+        try:
+            self.f.write(b"".join(dumps(cmd) + b"\n" for cmd in commands))
+            self.f.flush()
+            return True
+        except OSError:
+            self.close()
+            return False
+
+    def request(self, commands):
+        """Writes all commands at once and returns their responses in order.
+
+        Returns None if nothing could be sent (player not running or connection gone).
+        Replies still missing after IPC_TIMEOUT come back as {"error": "timeout"}.
+        """
+        if not self.f:
+            return None
+
+        ids = [next(self._ids) for _ in commands]
+        payload = b"".join(
+            dumps(dict(cmd, request_id=i)) + b"\n"
+            for i, cmd in zip(ids, commands)
+        )
+        try:
+            self.f.write(payload)
+            self.f.flush()
+        except OSError:
+            self.close()
+            return None
+
+        # One deadline for the whole request, so a stream of event lines can't extend it
+        deadline = time.monotonic() + IPC_TIMEOUT
+        responses = {}
+        try:
+            while len(responses) < len(commands):
+                line = self._readline(deadline)
+                if not line:
+                    self.close()
+                    break
+                # Event lines carry no request_id; skip them without parsing
+                if b'"request_id"' not in line:
+                    continue
+                resp = loads(line)
+                # Skip replies to other requests
+                if resp.get("request_id") in ids:
+                    responses[resp["request_id"]] = resp
+        except socket.timeout:
+            # Late replies would be out of sync on this connection; start fresh
+            self.close()
+            return [responses.get(i, {"error": "timeout"}) for i in ids]
+        except (OSError, ValueError):
+            self.close()
+        return [responses.get(i) for i in ids]
+
+# Process-wide connection, reused by every call in this process. A request's
+# write and its reply reads must not interleave with another's on the one pipe;
+# today's callers are single-threaded, so the lock only makes the module safe to
+# share across threads (e.g. if the MCP server ever runs tools concurrently).
+_ipc_conn = None
+_ipc_lock = threading.Lock()
+
+def _close_connection():
+    if _ipc_conn is not None:
+        _ipc_conn.close()
+
+atexit.register(_close_connection)
+
+def _connection():
+    global _ipc_conn
+    if _ipc_conn is None or not _ipc_conn.f:
+        _ipc_conn = MpvIpc().connect()
+    return _ipc_conn
+
+def _request(commands):
+    """Sends commands over the shared connection, reconnecting once if it went stale."""
+    with _ipc_lock:
+        for _ in range(2):
+            responses = _connection().request(commands)
+            if responses is not None:
+                return responses
+    return None
+
+def batch_get(props):
+    """Gets several properties in one round trip, keyed by property name."""
+    responses = _request([{"command": ["get_property", p]} for p in props])
+    return dict(zip(props, responses or [None] * len(props)))
+
+def send_ipc_command(command, wait=True):
+    """Sends a JSON-formatted command to the MPV IPC pipe.
+
+    With wait=False the command is only written (for fire-and-forget controls)
+    and the result is whether it was sent.
+    """
+    if not wait:
+        return send_ipc_batch([command], wait=False)
+    responses = _request([command])
+    if responses is None:
         return None
+    return responses[0] or {"error": "no_response"}
+
+def send_ipc_batch(commands, wait=True):
+    """Sends several commands in one write and returns their responses in order.
+
+    Returns None if MPV is not running. With wait=False no replies are read and
+    the result is just whether the commands were sent.
+    """
+    if wait:
+        return _request(commands)
+    with _ipc_lock:
+        for _ in range(2):
+            if _connection().send(commands):
+                return True
+    return False
 
 def get_ipc_property(prop):
     """Gets a property from MPV."""
-    try:
-        with connect_ipc() as f:
-            cmd = {"command": ["get_property", prop]}
-            payload = json.dumps(cmd).encode("utf-8") + b"\n"
-            f.write(payload)
-            f.flush()
-            
-            # Simple read line
-            response = f.readline().decode("utf-8")
-            return json.loads(response)
-    except (FileNotFoundError, ConnectionRefusedError, OSError):
-        return None
-    except Exception:
-        return None
+    responses = _request([{"command": ["get_property", prop]}])
+    return responses[0] if responses else None
@@ -0,0 +1,27 @@
+"""JSON encode/decode helpers. Uses orjson when installed, else the stdlib."""
+
+def _dumps_indented(obj):
+    """Indented, ASCII-escaped output for stdout, which may not be UTF-8 (cp1252 pipes on Windows)."""
+    import json
+    return json.dumps(obj, indent=2).encode("ascii")
+
+try:
+    import orjson
+
+    def dumps(obj, indent=False):
+        """Serializes obj to UTF-8 bytes (ASCII-escaped when indented)."""
+        if indent:
+            return _dumps_indented(obj)
+        return orjson.dumps(obj)
+
+    loads = orjson.loads
+except ImportError:
+    import json
+
+    def dumps(obj, indent=False):
+        """Serializes obj to UTF-8 bytes, compact like orjson unless indent is set."""
+        if indent:
+            return _dumps_indented(obj)
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    loads = json.loads
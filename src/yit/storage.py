@@ -1,43 +1,194 @@
-import json
-from .config import HISTORY_FILE, FAV_FILE, ensure_yit_dir
+import os
+import sys
+import time
+import tempfile
+from .config import (
+    HISTORY_FILE, HISTORY_INDEX_FILE, LEGACY_HISTORY_FILE,
+    FAV_FILE, LEGACY_FAV_FILE, SEARCH_CACHE_FILE, RESULTS_FILE, CACHE_TTL, ensure_yit_dir
+)
+from .jsonio import dumps, loads
+
+SEARCH_CACHE_TTL = CACHE_TTL
+SEARCH_CACHE_SIZE = 200
+
+def atomic_write(path, data):
+    """Writes bytes to path via a temp file so readers never see a torn file.
+
+    The temp name is unique, so concurrent yit processes can't race on it.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError: pass
+        raise
+
+# path -> ((mtime, size), parsed JSON), so unchanged files are parsed once per process
+_json_cache = {}
+
+def load_json(path):
+    """Parses a JSON file, reusing the last result while the file is unchanged on disk."""
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _json_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    with open(path, "rb") as f:
+        data = loads(f.read())
+    _json_cache[path] = (key, data)
+    return data
+
+def _migrate_legacy_history():
+    """Converts the old history.json (list or URL-keyed dict) to NDJSON once."""
+    if HISTORY_FILE.exists() or not LEGACY_HISTORY_FILE.exists():
+        return
+    try:
+        with open(LEGACY_HISTORY_FILE, "rb") as f:
+            data = loads(f.read())
+        unique = {}
+        for t in (data.values() if isinstance(data, dict) else data):
+            unique.setdefault(t["url"], t)
+        atomic_write(HISTORY_FILE, b"".join(dumps(t) + b"\n" for t in unique.values()))
+        atomic_write(HISTORY_INDEX_FILE, "".join(u + "\n" for u in unique).encode("utf-8"))
+        os.remove(LEGACY_HISTORY_FILE)
+    except Exception as e:
+        print(f"Warning: Could not migrate history: {e}", file=sys.stderr)
+
+def _iter_ndjson(path):
+    """Yields the objects in an NDJSON file line by line; a missing file yields nothing."""
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return
+    with f:
+        for line in f:
+            try:
+                yield loads(line)
+            except ValueError:
+                continue # Blank or torn line
+
+def iter_history():
+    """Yields history tracks, streaming the NDJSON file line by line."""
+    _migrate_legacy_history()
+    return _iter_ndjson(HISTORY_FILE)
+
+# (index file (mtime, size), URL set), so repeat saves in one process skip the re-read
+_history_url_cache = (None, set())
+
+def _index_key():
+    st = os.stat(HISTORY_INDEX_FILE)
+    return (st.st_mtime_ns, st.st_size)
+
+def _history_urls():
+    """Loads the set of URLs already in history (rebuilding the index if missing)."""
+    global _history_url_cache
+    try:
+        key = _index_key()
+    except FileNotFoundError:
+        urls = {t["url"] for t in iter_history()}
+        if urls:
+            atomic_write(HISTORY_INDEX_FILE, "".join(u + "\n" for u in urls).encode("utf-8"))
+        return urls
+    if _history_url_cache[0] != key:
+        with open(HISTORY_INDEX_FILE, "r", encoding="utf-8") as f:
+            _history_url_cache = (key, {line.rstrip("\n") for line in f})
+    return _history_url_cache[1]
+
+def save_tracks_to_history(tracks):
+    """Appends tracks not already in history with one write per file."""
+    global _history_url_cache
+    ensure_yit_dir()
+    try:
+        known = _history_urls()
+        new = {}
+        for t in tracks:
+            if t["url"] not in known:
+                new.setdefault(t["url"], t)
+        if not new:
+            return
+        with open(HISTORY_FILE, "ab") as f:
+            f.write(b"".join(dumps(t) + b"\n" for t in new.values()))
+        with open(HISTORY_INDEX_FILE, "a", encoding="utf-8") as f:
+            f.write("".join(u + "\n" for u in new))
+        _history_url_cache = (_index_key(), known | new.keys())
+    except Exception as e:
+        print(f"Warning: Could not save history: {e}", file=sys.stderr)
 
 def save_to_history(track):
-    """Saves a track to the persistent history file."""
+    """Appends a track to the persistent history file, unless already there."""
+    save_tracks_to_history([track])
+
+def _search_key(query):
+    # Only searches need it; control commands skip the import
+    import hashlib
+    normalized = " ".join(query.lower().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+def _load_search_cache():
+    try:
+        return load_json(SEARCH_CACHE_FILE)
+    except (OSError, ValueError):
+        return {}
+
+def get_cached_search(query):
+    """Returns cached results for query if younger than SEARCH_CACHE_TTL, else None."""
+    entry = _load_search_cache().get(_search_key(query))
+    if entry and time.time() - entry["ts"] < SEARCH_CACHE_TTL:
+        return entry["results"]
+    return None
+
+def cache_search(query, results):
+    """Stores results for query, evicting the oldest entries beyond SEARCH_CACHE_SIZE."""
     ensure_yit_dir()
-    history = []
-    if HISTORY_FILE.exists():
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                history = json.load(f)
-        except Exception:
-            pass 
-
-    # Check for duplicates or update
-    existing = None
-    for item in history:
-        if item.get("url") == track["url"]:
-            existing = item
-            break
-            
-    if not existing:
-        history.append(track)
-        
-    try:
-        with open(HISTORY_FILE, "w") as f:
-            json.dump(history, f, indent=4)
+    cache = _load_search_cache()
+    cache[_search_key(query)] = {"ts": time.time(), "results": results}
+    if len(cache) > SEARCH_CACHE_SIZE:
+        newest = sorted(cache.items(), key=lambda kv: kv[1]["ts"])[-SEARCH_CACHE_SIZE:]
+        cache = dict(newest)
+    try:
+        atomic_write(SEARCH_CACHE_FILE, dumps(cache))
+    except OSError as e:
+        print(f"Warning: Could not save search cache: {e}", file=sys.stderr)
+
+def save_results(results):
+    """Atomically writes search results, skipping the write if they are unchanged."""
+    data = dumps(results)
+    try:
+        with open(RESULTS_FILE, "rb") as f:
+            if f.read() == data:
+                return
+    except OSError:
+        pass
+    atomic_write(RESULTS_FILE, data)
+
+def _migrate_legacy_favorites():
+    """Converts the old favorites.json array to NDJSON once."""
+    if FAV_FILE.exists() or not LEGACY_FAV_FILE.exists():
+        return
+    try:
+        with open(LEGACY_FAV_FILE, "rb") as f:
+            save_favorites(loads(f.read()))
+        os.remove(LEGACY_FAV_FILE)
     except Exception as e:
-        print(f"Warning: Could not save history: {e}")
+        print(f"Warning: Could not migrate favorites: {e}", file=sys.stderr)
 
 def load_favorites():
-    if not FAV_FILE.exists():
-        return []
-    try:
-        with open(FAV_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return []
+    """Returns (favorites, set of their URLs) for O(1) duplicate checks."""
+    _migrate_legacy_favorites()
+    favs = list(_iter_ndjson(FAV_FILE))
+    return favs, {f["url"] for f in favs}
+
+def add_favorite(track):
+    """Appends one track to favorites without rewriting the file."""
+    ensure_yit_dir()
+    with open(FAV_FILE, "ab") as f:
+        f.write(dumps(track) + b"\n")
 
 def save_favorites(favs):
+    """Rewrites the whole favorites file (used for removals)."""
     ensure_yit_dir()
-    with open(FAV_FILE, "w") as f:
-        json.dump(favs, f, indent=4)
+    atomic_write(FAV_FILE, b"".join(dumps(t) + b"\n" for t in favs))
@@ -1,10 +1,13 @@
+import os
+import re
+import functools
 import time
-import json
-import requests
 import threading
 from importlib.metadata import version, PackageNotFoundError
 
-from .config import UPDATE_FILE
+from .config import UPDATE_FILE, CACHE_TTL
+from .jsonio import dumps, loads
+from .storage import atomic_write
 
 try:
     __version__ = version("yit-player")
@@ -15,13 +18,14 @@ def check_for_updates():
     """Checks PyPI for a newer version once a day in a background thread."""
     def _check():
         try:
+            import requests
             now = time.time()
-            # Enforce 24h cache (86400 seconds)
+            # Enforce 24h cache
             if UPDATE_FILE.exists():
                 try:
-                    with open(UPDATE_FILE, "r") as f:
-                        data = json.load(f)
-                        if now - data.get("last_checked", 0) < 86400:
+                    with open(UPDATE_FILE, "rb") as f:
+                        data = loads(f.read())
+                        if now - data.get("last_checked", 0) < CACHE_TTL:
                             return
                 except: pass
 
@@ -29,48 +33,47 @@ def check_for_updates():
             resp.raise_for_status()
             latest = resp.json()["info"]["version"]
             
-            with open(UPDATE_FILE, "w") as f:
-                json.dump({"last_checked": now, "latest_version": latest}, f)
+            atomic_write(UPDATE_FILE, dumps({"last_checked": now, "latest_version": latest}))
         except Exception:
             pass # Fail silently
             
     t = threading.Thread(target=_check, daemon=True)
     t.start()
 
+@functools.lru_cache(maxsize=1)
+def _available_update(mtime_ns):
+    """Returns the newer version recorded in UPDATE_FILE, or None. Keyed by mtime."""
+    with open(UPDATE_FILE, "rb") as f:
+        latest = loads(f.read()).get("latest_version")
+    return latest if latest and _is_newer(latest, __version__) else None
+
 def show_update_notice():
     """Prints a non-blocking notice if an update is available."""
-    if __version__ == "unknown" or not UPDATE_FILE.exists():
+    if __version__ == "unknown":
         return
         
     try:
-        with open(UPDATE_FILE, "r") as f:
-            data = json.load(f)
-            latest = data.get("latest_version")
-            if latest and _is_newer(latest, __version__):
-                print(f"\033[93m[Update Available: yit-player {latest}] Run `pip install --upgrade yit-player`\033[0m")
+        latest = _available_update(os.stat(UPDATE_FILE).st_mtime_ns)
+        if latest:
+            print(f"\033[93m[Update Available: yit-player {latest}] Run `pip install --upgrade yit-player`\033[0m")
     except Exception:
         pass
 
+@functools.lru_cache(maxsize=8)
+def _version_tuple(v):
+    return tuple(([int(x) for x in v.split('.')] + [0, 0, 0])[:3])
+
 def _is_newer(latest, current):
     """Simple semver comparison."""
     try:
-        def pad(v): return [int(x) for x in v.split('.')] + [0,0,0]
-        return pad(latest)[:3] > pad(current)[:3]
+        return _version_tuple(latest) > _version_tuple(current)
     except: return False
 
+# v= parameter, youtu.be/ID, /embed/ID or /shorts/ID (IDs are 11 chars)
+_VID_RE = re.compile(r"(?:v=|youtu\.be/|/embed/|/shorts/)([A-Za-z0-9_-]{11})")
+
+@functools.lru_cache(maxsize=1024)
 def extract_video_id(url):
     """Extracts YouTube Video ID from URL."""
-    if not url: return None
-    # Standard v= parameter
-    if "v=" in url:
-        try:
-            return url.split("v=")[1].split("&")[0][:11] # ID is 11 chars
-        except:
-            pass
-    # Shortened youtu.be/ID
-    if "youtu.be/" in url:
-        try:
-            return url.split("youtu.be/")[1][:11]
-        except:
-            pass
-    return None
+    m = _VID_RE.search(url or "")
+    return m.group(1) if m else None